@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 import sys
+import functools
+import math
 import random
+import re
 from dataclasses import dataclass
-from typing import Optional, Dict, Tuple, List, Set
+from typing import Optional, Dict, Tuple, List
 
+import numpy as np
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtGui import QFontDatabase
 
@@ -15,27 +19,55 @@ from PyQt5.QtGui import QFontDatabase
 # 平台与字体挑选
 IS_WIN = sys.platform.startswith("win")
 
+# 字体库查询需遍历全部字体家族，结果在进程内不变，首次调用后缓存
+# （QFontDatabase 须在 QApplication 创建之后使用，故不在导入时计算）
+@functools.lru_cache(maxsize=None)
 def _pick_win_yahei_family() -> str:
     db = QFontDatabase()
+    families = set(db.families())
     for fam in ("Microsoft YaHei UI", "Microsoft YaHei"):  # UI 优先，适合小字号
-        if fam in db.families():
+        if fam in families:
             return fam
     return "Segoe UI"  #（极少见）
 
-def _get_ui_font(point_size: int) -> QtGui.QFont:
-    db = QFontDatabase()
+@functools.lru_cache(maxsize=None)
+def _pick_ui_family() -> str:
     if IS_WIN:
-        family = _pick_win_yahei_family()  # Windows 用微软雅黑
-    else:
-        preferred = [
-            "PingFang SC", "Hiragino Sans GB", "Noto Sans CJK SC",
-            "Microsoft YaHei", "Segoe UI", "Arial", "Helvetica", "Sans Serif",
-        ]
-        family = next((f for f in preferred if f in db.families()), QtGui.QFont().defaultFamily())
-
-    font = QtGui.QFont(family, point_size)
-    font.setBold(True)   # 保持原来的视觉风格（若嫌 Win 变胖，可改为 DemiBold）
-    return font
+        return _pick_win_yahei_family()  # Windows 用微软雅黑
+    preferred = [
+        "PingFang SC", "Hiragino Sans GB", "Noto Sans CJK SC",
+        "Microsoft YaHei", "Segoe UI", "Arial", "Helvetica", "Sans Serif",
+    ]
+    families = set(QFontDatabase().families())
+    return next((f for f in preferred if f in families), QtGui.QFont().defaultFamily())
+
+@functools.lru_cache(maxsize=None)
+def _font_calibration(family: str) -> Tuple[float, float, float]:
+    """每个字体家族只测量一次：数字步进宽度、单个数字紧致宽度/高度与像素字号之比。"""
+    f = QtGui.QFont(family)
+    f.setPixelSize(100)
+    f.setWeight(QtGui.QFont.DemiBold)
+    fm = QtGui.QFontMetricsF(f)
+    tight = fm.tightBoundingRect("8")
+    return fm.horizontalAdvance("8") / 100.0, tight.width() / 100.0, tight.height() / 100.0
+
+# 拟合结果只取决于字体家族、整数像素半径与数字位数，按此缓存
+@functools.lru_cache(maxsize=256)
+def _fit_font(family: str, px_r: int, ndigits: int) -> QtGui.QFont:
+    """
+    根据像素半径 px_r，按标定比例直接解出像素字号，
+    保证 ndigits 位数字在圆内留有适当边距（平台/DPI 无关，跨平台一致）。
+    """
+    advance, w_one, h = _font_calibration(family)
+    # n 位数字的紧致宽度 ≈ (n-1) 个步进 + 1 个数字的紧致宽度；按比例线性缩放，
+    # 与原先逐次二分拟合的结果近似（忽略小字号下的字形微调/取整误差）
+    w = (max(1, ndigits) - 1) * advance + w_one
+    # 预留一点边距，避免碰圆边（0.70～0.80）
+    target_px = int(0.72 * 2 * px_r / max(w, h, 1e-6))
+    f = QtGui.QFont(family)
+    f.setPixelSize(max(6, min(int(px_r * 2.2), target_px)))  # 核心：像素字号，摆脱点字号与平台缩放差异
+    f.setWeight(QtGui.QFont.DemiBold)     # 比 setBold(True) 温和，跨平台外观更稳定
+    return f
 
 BTN_STYLE = {
     'primary': ("#1e88e5", "#1565c0"),   # 蓝
@@ -69,7 +101,7 @@ def style_frame(frame: QtWidgets.QFrame):
 # 模型：二叉排序树（BST）
 # =============================
 
-@dataclass(eq=False)
+@dataclass(eq=False, slots=True)
 class BSTNode:
     key: int
     left: Optional['BSTNode'] = None
@@ -85,16 +117,22 @@ class BSTNode:
 class BST:
     def __init__(self):
         self.root: Optional[BSTNode] = None
+        # 中序/深度缓存：仅在结构变化（插入/删除/清空）后重新计算
+        self._dirty = True
+        self._cached_inorder: Optional[List[int]] = None
+        self._cached_depth: Optional[int] = None
 
     def insert(self, key: int) -> Tuple[Optional[BSTNode], Optional[BSTNode]]:
         y = None
         x = self.root
         while x is not None:
             y = x
-            if key == x.key:
+            xk = x.key  # 每轮只读一次 key
+            if key == xk:
                 return None, x  # 重复
-            x = x.left if key < x.key else x.right
+            x = x.left if key < xk else x.right
         z = BSTNode(key=key, parent=y)
+        self._dirty = True
         if y is None:
             self.root = z
         elif key < y.key:
@@ -105,12 +143,14 @@ class BST:
 
     def search(self, key: int) -> Tuple[List[BSTNode], Optional[BSTNode]]:
         path: List[BSTNode] = []
+        append = path.append
         x = self.root
         while x is not None:
-            path.append(x)
-            if key == x.key:
+            append(x)
+            xk = x.key
+            if key == xk:
                 return path, x
-            x = x.left if key < x.key else x.right
+            x = x.left if key < xk else x.right
         return path, None
 
     def minimum(self, x: BSTNode) -> BSTNode:
@@ -132,6 +172,7 @@ class BST:
         _, z = self.search(key)
         if z is None:
             return None
+        self._dirty = True
         if z.left is None:
             self.transplant(z, z.right)
         elif z.right is None:
@@ -148,33 +189,63 @@ class BST:
         return z
 
     def inorder(self) -> List[int]:
-        res: List[int] = []
-        def dfs(n: Optional[BSTNode]):
-            if not n: return
-            dfs(n.left); res.append(n.key); dfs(n.right)
-        dfs(self.root)
-        return res
+        self._refresh_cache()
+        return list(self._cached_inorder)  # 返回副本，调用方修改不会污染缓存
+
+    def _refresh_cache(self):
+        if not self._dirty: return
+        self._cached_inorder = [n.key for n in self.nodes()]
+        self._cached_depth = self._compute_depth()
+        self._dirty = False
 
     def nodes(self) -> List[BSTNode]:
+        # 显式栈迭代中序，避免退化树触发递归深度上限
         out: List[BSTNode] = []
-        def dfs(n: Optional[BSTNode]):
-            if not n: return
-            dfs(n.left); out.append(n); dfs(n.right)
-        dfs(self.root)
+        stack: List[BSTNode] = []
+        x = self.root
+        while x is not None or stack:
+            while x is not None:
+                stack.append(x); x = x.left
+            x = stack.pop()
+            out.append(x)
+            x = x.right
         return out
 
     def depth(self) -> int:
-        def h(n: Optional[BSTNode]) -> int:
-            return 0 if not n else 1 + max(h(n.left), h(n.right))
-        return h(self.root)
+        self._refresh_cache()
+        return self._cached_depth
+
+    def _compute_depth(self) -> int:
+        if self.root is None: return 0
+        max_d = 0
+        stack: List[Tuple[BSTNode, int]] = [(self.root, 1)]
+        while stack:
+            n, d = stack.pop()
+            if d > max_d: max_d = d
+            if n.left is not None: stack.append((n.left, d+1))
+            if n.right is not None: stack.append((n.right, d+1))
+        return max_d
 
     def clear(self):
         self.root = None
+        self._dirty = True
 
 # =============================
 # 图形项：边与节点
 # =============================
 
+def _opengl_available() -> bool:
+    """能否创建并激活 OpenGL 上下文；不能时 QOpenGLWidget 视口会是空白画布。"""
+    ctx = QtGui.QOpenGLContext()
+    if not ctx.create():
+        return False
+    surface = QtGui.QOffscreenSurface()
+    surface.setFormat(ctx.format())
+    surface.create()
+    ok = surface.isValid() and ctx.makeCurrent(surface)
+    if ok: ctx.doneCurrent()
+    return ok
+
 # 自适应画布的 QGraphicsView
 class AdaptiveGraphicsView(QtWidgets.QGraphicsView):
     resized = QtCore.pyqtSignal()  # 画布尺寸改变信号
@@ -188,110 +259,133 @@ class AdaptiveGraphicsView(QtWidgets.QGraphicsView):
         self.resized.emit()
 
 class EdgeItem(QtWidgets.QGraphicsPathItem):
-    def __init__(self, parent_pos: QtCore.QPointF, child_pos: QtCore.QPointF, r: float):
+    """整棵树的所有连线合并在同一个路径项中，只需一次 drawPath。"""
+    # 所有边共享同一支画笔
+    _PEN = QtGui.QPen(QtCore.Qt.black)
+    _PEN.setWidthF(1.5)
+
+    def __init__(self, r: float = 22.0):
         super().__init__()
         self.setZValue(-1)
-        pen = QtGui.QPen(QtCore.Qt.black)
-        pen.setWidthF(1.5)
-        self.setPen(pen)
+        self.setPen(self._PEN)
         self.r = r
-        self.update_path(parent_pos, child_pos)
-
-    def update_path(self, p: QtCore.QPointF, c: QtCore.QPointF):
-        v = QtCore.QPointF(c.x() - p.x(), c.y() - p.y())
-        dist = max(1e-6, (v.x()**2 + v.y()**2)**0.5)
-        ux, uy = v.x()/dist, v.y()/dist
-        start = QtCore.QPointF(p.x() + ux*self.r, p.y() + uy*self.r)
-        end   = QtCore.QPointF(c.x() - ux*self.r, c.y() - uy*self.r)
-        path = QtGui.QPainterPath(start)
-        path.lineTo(end)
-        ah, aw = self.r*0.6, self.r*0.5
-        left  = QtCore.QPointF(end.x()-ux*ah-uy*aw, end.y()-uy*ah+ux*aw)
-        right = QtCore.QPointF(end.x()-ux*ah+uy*aw, end.y()-uy*ah-ux*aw)
-        path.moveTo(end); path.lineTo(left)
-        path.moveTo(end); path.lineTo(right)
+
+    def update_path(self, pairs: List[Tuple[QtCore.QPointF, QtCore.QPointF]]):
+        # 直接用浮点重载 moveTo/lineTo 写入路径，避免逐边构造中间 QPointF
+        path = QtGui.QPainterPath()
+        move_to, line_to, hypot = path.moveTo, path.lineTo, math.hypot
+        r = self.r; ah, aw = r*0.6, r*0.5
+        for p, c in pairs:
+            px, py = p.x(), p.y(); cx, cy = c.x(), c.y()
+            dx, dy = cx - px, cy - py
+            d = hypot(dx, dy) or 1e-6
+            ux, uy = dx/d, dy/d
+            ex, ey = cx - ux*r, cy - uy*r
+            move_to(px + ux*r, py + uy*r); line_to(ex, ey)
+            move_to(ex, ey); line_to(ex - ux*ah - uy*aw, ey - uy*ah + ux*aw)
+            move_to(ex, ey); line_to(ex - ux*ah + uy*aw, ey - uy*ah - ux*aw)
         self.setPath(path)
 
-class NodeItem(QtWidgets.QGraphicsItemGroup):
+class NodeItem(QtWidgets.QGraphicsObject):
     # 统一的配色（可按需微调）
     _C_STROKE = QtGui.QColor("#2559a5")  # 边
     _C_FILL   = QtGui.QColor("#d0deed")  # 填充
     _C_FILL_HL= QtGui.QColor("#6686D7")  # 高亮
+    # 画笔/画刷在所有节点间共享，避免每个节点重复构造
+    _BRUSH_FILL = QtGui.QBrush(_C_FILL)
+    _BRUSH_HL   = QtGui.QBrush(_C_FILL_HL)
+    _PEN = QtGui.QPen(_C_STROKE)
+    _PEN.setWidthF(3.0)
+
+    # 圆形底图缓存：(整数半径, 是否高亮, 设备像素比) -> QPixmap，所有节点共享
+    _PIXMAP_CACHE: Dict[Tuple[int, bool, float], QtGui.QPixmap] = {}
 
     def __init__(self, key: int, radius: float = 22.0):
         super().__init__()
         self.key = key
-        self.radius = radius
+        self.radius = float(round(radius))  # 取整像素半径：位图、包围盒与连线端点共用同一值
         self.on_click = None  # 可注入回调
+        self._highlighted = False
+        self._pixmaps: Dict[bool, QtGui.QPixmap] = {}  # 是否高亮 -> 已绘好文字的节点图
+
+        # 圆 + 文字预先渲染为位图，绘制时只需一次贴图；由本项统一接收点击
+        self.pixmap_item = QtWidgets.QGraphicsPixmapItem(self)
+        self.pixmap_item.setAcceptedMouseButtons(QtCore.Qt.NoButton)
+        self._fit_text_to_radius()           # 自适应字号（同档位字体由 _fit_font 缓存共享）
 
-        # 圆形：浅蓝填充 + 蓝色描边（加粗一点更清晰）
-        self.circle = QtWidgets.QGraphicsEllipseItem(-radius, -radius, 2*radius, 2*radius)
-        self.circle.setBrush(QtGui.QBrush(self._C_FILL))
-        pen = QtGui.QPen(self._C_STROKE)
-        pen.setWidthF(3.0)
-        self.circle.setPen(pen)
-
-        # 文本
-        self.text = QtWidgets.QGraphicsSimpleTextItem(str(key))
-        # 先给一个占位字体（只决定字形/家族，不锁定字号）
-        self.text.setFont(_get_ui_font(10))  # 字体家族复用你原来的选择
-        self._fit_text_to_radius()           # 自适应字号并居中
-
-        # 分组
-        self.addToGroup(self.circle)
-        self.addToGroup(self.text)
         self.setFlag(QtWidgets.QGraphicsItem.ItemIsSelectable, True)
         self.setZValue(1)
 
+    def boundingRect(self) -> QtCore.QRectF:
+        r = self.radius
+        return QtCore.QRectF(-r, -r, 2*r, 2*r)
+
+    def paint(self, painter, option, widget=None):
+        # 节点本身交给子项绘制；仅在选中时画虚线框（与原 QGraphicsItemGroup 一致）
+        if option.state & QtWidgets.QStyle.State_Selected:
+            painter.save()  # 视图启用了 DontSavePainterState，需自行恢复画笔状态
+            painter.setPen(QtGui.QPen(QtCore.Qt.black, 0, QtCore.Qt.DashLine))
+            painter.setBrush(QtCore.Qt.NoBrush)
+            painter.drawRect(self.boundingRect())
+            painter.restore()
+
+    @classmethod
+    def _circle_pixmap(cls, px_r: int, on: bool) -> QtGui.QPixmap:
+        dpr = QtWidgets.QApplication.instance().devicePixelRatio()
+        key = (px_r, on, dpr)
+        pm = cls._PIXMAP_CACHE.get(key)
+        if pm is None:
+            side = 2*px_r + 4  # 两侧各留出描边宽度
+            pm = QtGui.QPixmap(int(side*dpr + 0.5), int(side*dpr + 0.5))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(QtCore.Qt.transparent)
+            painter = QtGui.QPainter(pm)
+            painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+            # 圆形：浅蓝填充 + 蓝色描边（加粗一点更清晰）
+            painter.setBrush(cls._BRUSH_HL if on else cls._BRUSH_FILL)
+            painter.setPen(cls._PEN)
+            painter.drawEllipse(QtCore.QRectF(2, 2, 2*px_r, 2*px_r))
+            painter.end()
+            cls._PIXMAP_CACHE[key] = pm
+        return pm
+
+    def _node_pixmap(self, on: bool) -> QtGui.QPixmap:
+        pm = self._pixmaps.get(on)
+        if pm is None:
+            # 在共享圆形底图的副本上写入数字（仅在键/半径/字体变化时重绘）
+            pm = self._circle_pixmap(int(self.radius), on).copy()
+            side = pm.width() / pm.devicePixelRatio()
+            painter = QtGui.QPainter(pm)
+            painter.setRenderHint(QtGui.QPainter.TextAntialiasing, True)
+            painter.setFont(self._font)
+            painter.drawText(QtCore.QRectF(0, 0, side, side), QtCore.Qt.AlignCenter, str(self.key))
+            painter.end()
+            self._pixmaps[on] = pm
+        return pm
+
+    def _refresh_pixmap(self):
+        self._pixmaps.clear()
+        pm = self._node_pixmap(self._highlighted)
+        half = pm.width() / pm.devicePixelRatio() / 2.0
+        self.pixmap_item.setPixmap(pm)
+        self.pixmap_item.setOffset(-half, -half)
+
     def _fit_text_to_radius(self):
-        """
-        根据当前 self.radius，利用像素字号 + QFontMetricsF 进行二分拟合，
-        保证文字在圆内留有适当边距（平台/DPI 无关，跨平台一致）。
-        """
-        d = 2.0 * self.radius
-        # 预留一点边距，避免碰圆边（0.70～0.80）
-        max_w = max_h = d * 0.72
-
-        # 保持家族一致（不要用粗体，粗体在 Windows 会显得更“大”）
-        fam = _pick_win_yahei_family() if IS_WIN else self.text.font().family()
-
-        lo, hi = 6, int(self.radius * 2.2)  # 像素字号搜索范围
-        best = lo
-        best_font = None
-
-        while lo <= hi:
-            mid = (lo + hi) // 2
-            f = QtGui.QFont(fam)
-            f.setPixelSize(mid)                   # 核心：像素字号，摆脱点字号与平台缩放差异
-            f.setWeight(QtGui.QFont.DemiBold)     # 比 setBold(True) 温和，跨平台外观更稳定
-            fm = QtGui.QFontMetricsF(f)
-            br = fm.tightBoundingRect(str(self.key))
-
-            if br.width() <= max_w and br.height() <= max_h:
-                best = mid
-                best_font = f
-                lo = mid + 1
-            else:
-                hi = mid - 1
-
-        if best_font is None:
-            best_font = QtGui.QFont(fam)
-            best_font.setPixelSize(best)
-            best_font.setWeight(QtGui.QFont.DemiBold)
-
-        self.text.setFont(best_font)
-        # 重新测量后居中
-        br = self.text.boundingRect()
-        self.text.setPos(-br.width()/2.0, -br.height()/2.0)
+        self._font = _fit_font(_pick_ui_family(), int(self.radius), len(str(self.key)))
+        self._refresh_pixmap()
 
     def set_radius(self, r: float):
+        r = float(round(r))
+        bucket_changed = r != self.radius
+        if bucket_changed: self.prepareGeometryChange()  # 半径未变时不使包围盒/索引失效
         self.radius = r
-        self.circle.setRect(-r, -r, 2*r, 2*r)
-        self._fit_text_to_radius()  # 改半径时重新拟合字体与位置
+        # 仅当整数半径档位变化时才重新拟合字体并重绘节点图
+        if bucket_changed: self._fit_text_to_radius()
 
     def highlight(self, on: bool):
         # 高亮改成更深一点的浅蓝，关闭则恢复浅蓝
-        self.circle.setBrush(QtGui.QBrush(self._C_FILL_HL if on else self._C_FILL))
+        self._highlighted = on
+        self.pixmap_item.setPixmap(self._node_pixmap(on))
 
     def mousePressEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         if callable(self.on_click):
@@ -302,9 +396,16 @@ class NodeItem(QtWidgets.QGraphicsItemGroup):
 # 视图：BSTVisualizer
 # =============================
 
+# 输入中以空白/逗号分隔的整数（支持正负号），不完整的记号（如 3.5、1-2、1e3）整体忽略
+_NUM_RE = re.compile(r'(?<![^\s,，])[+-]?\d+(?![^\s,，])')
+
 class BSTVisualizer(QtWidgets.QMainWindow):
     SCENE_W = 850
     SCENE_H = 600
+    # 节点数超过该阈值时，动画期间关闭场景空间索引（BSP 树逐帧重建代价过高）
+    NOINDEX_THRESHOLD = 200
+    # 一次插入的节点数达到该值时，才值得关闭索引后整体重建
+    BATCH_NOINDEX_MIN = 16
 
     def __init__(self):
         super().__init__()
@@ -315,9 +416,19 @@ class BSTVisualizer(QtWidgets.QMainWindow):
         # 画布
         self.scene = QtWidgets.QGraphicsScene(0, 0, self.SCENE_W, self.SCENE_H)
         self.view = AdaptiveGraphicsView(self.scene)
-        self.view.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        if _opengl_available():
+            # OpenGL 视口：线条/圆形交给 GPU 绘制，抗锯齿由全局 MSAA 负责（见 main）
+            self.view.setViewport(QtWidgets.QOpenGLWidget())
+            # OpenGL 视口每帧整体重绘，局部更新反而多出区域计算开销
+            self.view.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
+        else:
+            # 无可用 OpenGL（远程桌面/部分虚拟机）：保留光栅视口，只重绘变化区域
+            self.view.setRenderHint(QtGui.QPainter.Antialiasing, True)
+            self.view.setViewportUpdateMode(QtWidgets.QGraphicsView.SmartViewportUpdate)
         self.view.setBackgroundBrush(QtGui.QBrush(QtGui.QColor(245, 247, 250)))
-        self.view.setViewportUpdateMode(QtWidgets.QGraphicsView.FullViewportUpdate)
+        self.scene.setItemIndexMethod(QtWidgets.QGraphicsScene.BspTreeIndex)
+        self.view.setOptimizationFlag(QtWidgets.QGraphicsView.DontAdjustForAntialiasing, True)
+        self.view.setOptimizationFlag(QtWidgets.QGraphicsView.DontSavePainterState, True)
         self.view.setFrameShape(QtWidgets.QFrame.NoFrame)  # 去除额外边框
         self.view.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         self.view.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
@@ -406,9 +517,12 @@ class BSTVisualizer(QtWidgets.QMainWindow):
 
         # 状态
         self.node_item: Dict[BSTNode, NodeItem] = {}
-        self.edge_items: List[EdgeItem] = []
+        self.edges_item = EdgeItem(); self.scene.addItem(self.edges_item)  # 常驻的单一连线图元
+        self.edge_relations: List[Tuple[BSTNode, BSTNode]] = []
         self.margin = 40
-        self.animations: List[QtCore.QVariantAnimation] = []
+        self.anim_group: Optional[QtCore.QParallelAnimationGroup] = None
+        self._last_radius = 22.0  # 最近一次布局得到的半径，用作新节点的初始半径
+        self._last_layout_sig: Optional[int] = None  # 最近一次布局的签名，布局未变时跳过动画
         self.update_info_panels("初始化完成")
 
         # 画布尺寸变化 -> 节流重布局
@@ -450,33 +564,37 @@ class BSTVisualizer(QtWidgets.QMainWindow):
         self.info_selected.setText(f"键：{key}，路径：{[n.key for n in path]}")
 
     def parse_numbers(self) -> List[int]:
-        text = self.input_edit.text().replace(',', ' ').replace('，', ' ')
-        nums: List[int] = []
-        for t in text.split():
-            try: nums.append(int(t))
-            except: pass
-        return nums
+        return [int(m.group()) for m in _NUM_RE.finditer(self.input_edit.text())]
 
     def show_info(self, title: str, msg: str):
         QtWidgets.QMessageBox.information(self, title, msg)
 
     # ===== 交互 =====
     def on_insert_clicked(self):
-        nums = self.parse_numbers() or ([int(self.input_edit.text().strip())] if self.input_edit.text().strip().isdigit() else [])
+        nums = self.parse_numbers()
         if not nums: self.show_info("插入", "请输入至少一个整数。"); return
-        dup = []
+        dup = []; new_items: List[NodeItem] = []
         for x in nums:
             node, parent = self.bst.insert(x)
             if node is None: dup.append(x); continue
-            item = NodeItem(x); item.on_click = self.on_node_selected
+            item = NodeItem(x, self._last_radius); item.on_click = self.on_node_selected
             start_pos = self.node_item[parent].pos() if (parent and parent in self.node_item) else QtCore.QPointF(self.SCENE_W/2, self.margin)
-            item.setPos(start_pos); self.scene.addItem(item); self.node_item[node] = item
+            item.setPos(start_pos); self.node_item[node] = item; new_items.append(item)
+        if new_items: self._last_layout_sig = None
+        if len(new_items) >= self.BATCH_NOINDEX_MIN:
+            # 大批量加入场景：期间关闭空间索引，结束后一次性重建，避免逐项增量维护 BSP 树；
+            # 大树则保持关闭，直到随后的动画结束再恢复
+            self.set_item_index(False)
+            for item in new_items: self.scene.addItem(item)
+            if len(self.node_item) <= self.NOINDEX_THRESHOLD: self.set_item_index(True)
+        else:
+            for item in new_items: self.scene.addItem(item)  # 少量节点增量加入索引更省
         self.relayout_and_animate()
         if dup: self.show_info("插入", f"已存在：{dup}")
         self.status.setText(f"当前节点数：{len(self.node_item)}"); self.input_edit.clear(); self.update_info_panels("插入完成")
 
     def on_search_clicked(self):
-        nums = self.parse_numbers() or ([int(self.input_edit.text().strip())] if self.input_edit.text().strip().isdigit() else [])
+        nums = self.parse_numbers()
         if not nums: self.show_info("查找", "请输入要查找的整数。"); return
         key = nums[0]
         path, node = self.bst.search(key)
@@ -486,19 +604,20 @@ class BSTVisualizer(QtWidgets.QMainWindow):
         self.input_edit.clear(); self.update_info_panels("查找完成")
 
     def on_delete_clicked(self):
-        nums = self.parse_numbers() or ([int(self.input_edit.text().strip())] if self.input_edit.text().strip().isdigit() else [])
+        nums = self.parse_numbers()
         if not nums: self.show_info("删除", "请输入要删除的整数。"); return
         key = nums[0]
         removed_node = self.bst.delete(key)
         if removed_node is None: self.show_info("删除", f"未找到 {key}"); return
+        self._last_layout_sig = None
         item = self.node_item.pop(removed_node, None)
         if item is not None: self.remove_item_immediately(item)
-        self.cleanup_orphans(); self.relayout_and_animate()
+        self.relayout_and_animate()
         self.show_info("删除", f"已删除 {key}")
         self.status.setText(f"当前节点数：{len(self.node_item)}"); self.input_edit.clear(); self.update_info_panels("删除完成")
 
     def on_clear_clicked(self):
-        self.bst.clear()
+        self.bst.clear(); self._last_layout_sig = None
         for it in list(self.node_item.values()): self.remove_item_immediately(it)
         self.node_item.clear(); self.clear_edges(); self.view.viewport().update()
         self.status.setText("已清空"); self.input_edit.clear(); self.update_info_panels("已清空")
@@ -516,22 +635,33 @@ class BSTVisualizer(QtWidgets.QMainWindow):
     def relayout_and_animate(self):
         if not self.bst.root: self.clear_edges(); return
         positions, radius = self.compute_layout()
+        # 布局（取整到像素）与上次相同且节点未增删时，无需重建动画与连线
+        sig = hash((int(radius), tuple((id(n), int(p.x()), int(p.y())) for n, p in positions.items())))
+        if sig == self._last_layout_sig: return
+        self._last_layout_sig = sig
+        self._last_radius = radius
         if self.chk_anim.isChecked(): self.animate_to_positions(positions, radius)
         else:
             for n, item in list(self.node_item.items()):
                 if n in positions: item.set_radius(radius); item.setPos(positions[n])
-            self.clear_edges()
+            self.set_item_index(True)
         self.rebuild_edges(positions, radius)
 
     def compute_layout(self) -> Tuple[Dict[BSTNode, QtCore.QPointF], float]:
-        index = 0; x_index: Dict[BSTNode, int] = {}; depth: Dict[BSTNode, int] = {}
-        def dfs(n: Optional[BSTNode], d: int):
-            nonlocal index
-            if not n: return
-            depth[n] = d; dfs(n.left, d+1); x_index[n] = index; index += 1; dfs(n.right, d+1)
-        dfs(self.bst.root, 0)
-        if not x_index: return {}, 20.0
-        n_nodes = len(x_index); max_depth = max(depth.values()) if depth else 0
+        # 迭代中序遍历：节点按中序排列，其下标即横向序号，同时记录深度
+        ordered: List[BSTNode] = []; depth_list: List[int] = []
+        stack: List[Tuple[BSTNode, int]] = []
+        n, d = self.bst.root, 0
+        while n is not None or stack:
+            while n is not None:
+                stack.append((n, d)); n = n.left; d += 1
+            n, d = stack.pop()
+            ordered.append(n); depth_list.append(d)
+            n = n.right; d += 1
+        if not ordered: return {}, 20.0
+        n_nodes = len(ordered)
+        depths = np.fromiter(depth_list, dtype=np.int32, count=n_nodes)
+        max_depth = int(depths.max())
         base_radius = 24.0; min_radius = 12.0; max_radius = 28.0
         base_h_gap = 3.2 * base_radius; base_v_gap = 4.0 * base_radius
         width_units = max(1, n_nodes-1)*base_h_gap + 2*base_radius
@@ -539,18 +669,22 @@ class BSTVisualizer(QtWidgets.QMainWindow):
         avail_w = self.SCENE_W - 2*self.margin
         avail_h = self.SCENE_H - 2*self.margin
         s = min(avail_w/width_units, avail_h/height_units, 1.2)
-        radius = max(min_radius, min(max_radius, base_radius*s))
+        # 半径取整到像素，与节点位图尺寸一致（连线端点也据此计算）
+        radius = float(round(max(min_radius, min(max_radius, base_radius*s))))
         h_gap = base_h_gap*s; v_gap = base_v_gap*s
-        positions: Dict[BSTNode, QtCore.QPointF] = {}
         total_w = (n_nodes-1)*h_gap + 2*radius; total_h = max(0, max_depth)*v_gap + 2*radius
         offset_x = (self.SCENE_W - total_w)/2 + radius; offset_y = (self.SCENE_H - total_h)/2 + radius
-        for n, xi in x_index.items():
-            positions[n] = QtCore.QPointF(offset_x + xi*h_gap, offset_y + depth[n]*v_gap)
+        xs = (offset_x + np.arange(n_nodes)*h_gap).tolist()
+        ys = (offset_y + depths*v_gap).tolist()
+        positions = {n: QtCore.QPointF(x, y) for n, x, y in zip(ordered, xs, ys)}
         return positions, radius
 
     def animate_to_positions(self, positions: Dict[BSTNode, QtCore.QPointF], radius: float):
-        for a in self.animations: a.stop()
-        self.animations.clear()
+        if self.anim_group is not None:
+            self.anim_group.stop(); self.anim_group.deleteLater()
+        group = QtCore.QParallelAnimationGroup(self)
+        # 核心：速度越大 -> 持续越短
+        duration = max(30, int(self.base_anim_ms / self.speed_mult))
         for n, item in list(self.node_item.items()):
             if n not in positions:
                 if item.scene() is not None: self.scene.removeItem(item)
@@ -559,13 +693,25 @@ class BSTVisualizer(QtWidgets.QMainWindow):
             start = item.pos(); end = positions[n]
             if (start - end).manhattanLength() < 0.5:
                 item.setPos(end); continue
-            anim = QtCore.QVariantAnimation(self)
-            # 核心：速度越大 -> 持续越短
-            duration = max(30, int(self.base_anim_ms / self.speed_mult))
+            # 节点位置由 Qt 在 C++ 侧直接写入 pos 属性
+            anim = QtCore.QPropertyAnimation(item, b"pos", group)
             anim.setDuration(duration)
             anim.setStartValue(start); anim.setEndValue(end)
-            anim.valueChanged.connect(lambda v, it=item: it.setPos(v))
-            anim.start(); self.animations.append(anim)
+            group.addAnimation(anim)
+        if group.animationCount():
+            # 所有动画时长一致，只需在最后一个（同帧内最后更新）上挂驱动回调逐帧刷新连线
+            group.animationAt(group.animationCount()-1).valueChanged.connect(self.refresh_edges)
+        group.finished.connect(self.refresh_edges)  # 结束时整体校正一次
+        # 大树动画期间改用线性拾取，结束后恢复 BSP 索引
+        self.set_item_index(not (group.animationCount() and len(self.node_item) > self.NOINDEX_THRESHOLD))
+        group.finished.connect(lambda: self.set_item_index(True))
+        self.anim_group = group
+        group.start()
+
+    def set_item_index(self, bsp: bool):
+        method = QtWidgets.QGraphicsScene.BspTreeIndex if bsp else QtWidgets.QGraphicsScene.NoIndex
+        if self.scene.itemIndexMethod() != method:
+            self.scene.setItemIndexMethod(method)
 
     def remove_item_immediately(self, item: NodeItem):
         try:
@@ -577,30 +723,25 @@ class BSTVisualizer(QtWidgets.QMainWindow):
             self.view.viewport().update()
 
     def clear_edges(self):
-        for e in self.edge_items: self.scene.removeItem(e)
-        self.edge_items.clear()
+        self.edge_relations.clear()
+        self.edges_item.setPath(QtGui.QPainterPath())
 
     def rebuild_edges(self, positions: Dict[BSTNode, QtCore.QPointF], radius: float):
-        self.clear_edges()
-        relations: List[Tuple[EdgeItem, BSTNode, BSTNode]] = []
-        for n, pos in positions.items():
-            if n.left is not None and n.left in positions:
-                e = EdgeItem(pos, positions[n.left], radius); self.scene.addItem(e); self.edge_items.append(e); relations.append((e, n, n.left))
-            if n.right is not None and n.right in positions:
-                e = EdgeItem(pos, positions[n.right], radius); self.scene.addItem(e); self.edge_items.append(e); relations.append((e, n, n.right))
-        def refresh_edges():
-            for e, pnode, cnode in relations:
-                if pnode in self.node_item and cnode in self.node_item:
-                    e.r = self.node_item[pnode].radius
-                    e.update_path(self.node_item[pnode].pos(), self.node_item[cnode].pos())
-        if self.animations:
-            timer = QtCore.QTimer(self); timer.setInterval(16); timer.timeout.connect(refresh_edges)
-            def stop_timer():
-                if not any(a.state() == QtCore.QAbstractAnimation.Running for a in self.animations):
-                    timer.stop(); refresh_edges()
-            timer.timeout.connect(stop_timer); timer.start()
-        else:
-            refresh_edges()
+        self.edge_relations = [
+            (n, c) for n in positions for c in (n.left, n.right)
+            if c is not None and c in positions
+        ]
+        self.edges_item.r = radius
+        # 以节点当前位置绘制一次；动画过程中由驱动回调逐帧刷新
+        self.refresh_edges()
+
+    def refresh_edges(self):
+        items = self.node_item; pairs = []
+        for pnode, cnode in self.edge_relations:
+            pitem = items.get(pnode); citem = items.get(cnode)
+            if pitem is None or citem is None: continue
+            pairs.append((pitem.pos(), citem.pos()))
+        self.edges_item.update_path(pairs)
 
     def flash_path(self, path: List[BSTNode], found: bool):
         # 基准（原先的固定值）
@@ -629,14 +770,6 @@ class BSTVisualizer(QtWidgets.QMainWindow):
                 QtCore.QTimer.singleShot(ms, lambda it=last_item: it.highlight(True))
                 QtCore.QTimer.singleShot(ms + final_ms, lambda it=last_item: it.highlight(False))
 
-    def cleanup_orphans(self):
-        alive: Set[BSTNode] = set(self.bst.nodes())
-        for n, item in list(self.node_item.items()):
-            if n not in alive:
-                self.remove_item_immediately(item)
-                self.node_item.pop(n, None)
-        self.view.viewport().update()
-
 # =============================
 # 启动
 # =============================
@@ -646,9 +779,14 @@ def main():
     QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_EnableHighDpiScaling, True)
     QtWidgets.QApplication.setAttribute(QtCore.Qt.AA_UseHighDpiPixmaps, True)
 
+    # OpenGL 视口的 4x 多重采样抗锯齿（同样需在 QApplication 之前设置）
+    fmt = QtGui.QSurfaceFormat()
+    fmt.setSamples(4)
+    QtGui.QSurfaceFormat.setDefaultFormat(fmt)
+
     app = QtWidgets.QApplication(sys.argv)
 
-    # Windows 全局字体（照顾到未走 _get_ui_font 的控件）
+    # Windows 全局字体（统一所有控件使用微软雅黑）
     if IS_WIN:
         app.setFont(QtGui.QFont(_pick_win_yahei_family(), 10))
 